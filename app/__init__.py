@@ -15,6 +15,8 @@ def create_app():
     app.register_blueprint(routes.bp)
     # Register recordings browser blueprint
     routes.register_recordings_blueprint(app)
+    # Register snapshot endpoints
+    routes.register_snapshot_blueprint(app)
 
     # Inicjalizujemy SocketIO
     socketio.init_app(app)
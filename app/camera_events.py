@@ -0,0 +1,137 @@
+import time
+from threading import Thread, Lock
+
+EVENT_POLL_MIN = 1.0  # Poll interval (s) right after a camera event
+EVENT_POLL_MAX = 10.0  # Poll interval (s) ceiling when the camera is idle, must not exceed EVENT_ACTIVE_WINDOW
+EVENT_POLL_FLOOR = 0.5  # Lowest accepted poll interval (s), protects the camera API from a busy loop
+EVENT_ACTIVE_WINDOW = 15.0  # How long (s) server-side CV stays awake after a camera event
+
+
+def validate_poll_intervals(min_interval, max_interval, active_window=EVENT_ACTIVE_WINDOW):
+    """Returns (min_interval, max_interval) as floats, falling back to the defaults when the
+    values are not numbers, min is below EVENT_POLL_FLOOR, min > max or max exceeds the active window.
+    """
+    try:
+        min_interval, max_interval = float(min_interval), float(max_interval)
+    except (TypeError, ValueError):
+        print("Invalid event_poll_min/event_poll_max, using defaults.")
+        return EVENT_POLL_MIN, EVENT_POLL_MAX
+    if not EVENT_POLL_FLOOR <= min_interval <= max_interval <= active_window:
+        print(f"event_poll_min/event_poll_max must satisfy {EVENT_POLL_FLOOR} <= min <= max <= {active_window}, using defaults.")
+        return EVENT_POLL_MIN, EVENT_POLL_MAX
+    return min_interval, max_interval
+
+
+def event_key(event):
+    return event.get('start_time'), event.get('alarm_type')
+
+
+def event_time(event):
+    """Latest known moment of an event, the camera may only list a clip once it has ended."""
+    return max(event['start_time'], event.get('end_time') or 0)
+
+
+class TapoEventSource:
+    """Reads detection events (motion, person, ...) from the camera through an authenticated pytapo session.
+    The camera only lists events when detection recording to an SD card is enabled.
+    `lock` must be the lock guarding every other call on the same Tapo session.
+    """
+
+    def __init__(self, camera, lock=None):
+        self.camera = camera
+        self.lock = lock or Lock()
+        self.seen = None  # Keys of events returned by the previous poll, None before the first poll
+
+    def poll(self):
+        """Returns events that appeared since the previous poll.
+        Events keep pytapo's shape, `start_time`/`end_time` are already local epoch seconds.
+        """
+        with self.lock:
+            events = self.camera.getEvents() or []  # Detection list of the last 10 minutes
+
+        if self.seen is None:
+            # First poll only sets the baseline, events from before startup are not reported
+            if not events:
+                print("Camera listed no detection events in the last 10 minutes. If motion is never reported, "
+                      "check that detection recording to an SD card is enabled.")
+            self.seen = {event_key(e) for e in events}
+            return []
+        new_events = [e for e in events if event_key(e) not in self.seen]
+        # getEvents always covers the same sliding window, so forget keys that left it
+        self.seen = {event_key(e) for e in events}
+        return new_events
+
+
+class StubEventSource:
+    """In-memory event source for tests, events are injected with push()."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pending = []
+
+    def push(self, alarm_type=2, start_time=None, end_time=None):
+        """Queues an event shaped like pytapo's getEvents() entries."""
+        if start_time is None:
+            start_time = time.time()
+        if end_time is None:
+            end_time = start_time
+        with self.lock:
+            self.pending.append({'start_time': start_time, 'end_time': end_time, 'alarm_type': alarm_type})
+
+    def poll(self):
+        with self.lock:
+            events, self.pending = self.pending, []
+        return events
+
+
+class CameraEventGate:
+    """Polls an event source with adaptive cadence and tells whether server-side CV should run.
+    The interval drops to `min_interval` when an event arrives and doubles up to `max_interval` while idle.
+    An event is noticed at most `max_interval` seconds late, and CV stays awake until `active_window`
+    seconds after the event (or its end, when the camera reports one).
+    """
+
+    def __init__(self, source, min_interval=EVENT_POLL_MIN, max_interval=EVENT_POLL_MAX,
+                 active_window=EVENT_ACTIVE_WINDOW, on_event=None):
+        self.source = source
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.active_window = active_window
+        self.on_event = on_event  # Called with the list of new events
+        self.interval = min_interval
+        self.active_until = 0.0
+        self.thread = None
+
+    def is_active(self):
+        """True while we are within `active_window` seconds of the last camera event."""
+        return time.time() < self.active_until
+
+    def poll_once(self):
+        """Polls the source once and updates the active window and next interval."""
+        try:
+            events = self.source.poll()
+        except Exception as e:
+            print(f"Camera event poll failed: {e}")
+            events = []
+
+        if events:
+            now = time.time()
+            # Count the window from when the event happened, not when we noticed it
+            happened = min(max(event_time(e) for e in events), now)
+            self.active_until = max(self.active_until, happened + self.active_window)
+            self.interval = self.min_interval
+            if self.on_event:
+                self.on_event(events)
+        elif not self.is_active():
+            self.interval = min(self.interval * 2, self.max_interval)
+        return events
+
+    def run(self):
+        while True:
+            self.poll_once()
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = Thread(target=self.run, daemon=True)
+            self.thread.start()
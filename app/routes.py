@@ -8,6 +8,8 @@ from threading import Thread, Lock
 from queue import Queue, Empty
 from . import socketio
 from .recordings_routes import recordings_bp
+from .snapshot_routes import snapshot_bp, publish_frame
+from .camera_events import TapoEventSource, CameraEventGate, validate_poll_intervals, EVENT_POLL_MIN, EVENT_POLL_MAX
 from flask_socketio import SocketIO
 from pytapo import Tapo
 from flask import request
@@ -42,6 +44,7 @@ camera_password = config.get('password')
 camera_url = config.get('rtsp_url')
 
 camera = None
+camera_lock = Lock()  # pytapo sessions are not thread-safe, guard every call on `camera`
 camera_connected = False
 last_connection_reason = None
 last_connection_hint = None
@@ -109,6 +112,7 @@ bp = Blueprint('main', __name__)
 
 previous_frame = None
 motion_thread = None
+event_gate = None  # Set when 'camera_events' is enabled in config.json
 
 
 recording = False  # Flag for recording state
@@ -129,6 +133,10 @@ def register_recordings_blueprint(app):
     app.config['OUTPUT_DIR'] = output_dir
 
 
+def register_snapshot_blueprint(app):
+    app.register_blueprint(snapshot_bp)
+
+
 # Perform initial connectivity check on import/startup
 try:
     ok, reason = check_camera_connection()
@@ -260,6 +268,8 @@ def capture_frames():
     STREAM_HEIGHT = 360
     STREAM_FPS = 30  # Restore to 30 FPS for smoother camera movement
 
+    motion_window_open = False  # Whether server-side motion detection ran since the event gate last closed
+
     while True:
         try:
             success, frame = cap.read()
@@ -269,6 +279,9 @@ def capture_frames():
                 print("Warning: Corrupted or empty frame, skipping...")
                 continue
 
+            # Keep the full-resolution frame for /snapshot.jpg and /snapshot/burst
+            publish_frame(frame)
+
             # Put frame in queue for recording if recording is active
             if recording:
                 try:
@@ -295,10 +308,19 @@ def capture_frames():
             socketio.emit('video_frame', {'frame': frame_b64})
 
             # Start motion detection in a separate thread if it hasn't already started
-            global motion_thread
-            if motion_thread is None or not motion_thread.is_alive():
-                motion_thread = Thread(target=motion_detection_task, args=(frame,))
-                motion_thread.start()
+            global motion_thread, previous_frame
+            if event_gate is not None and not event_gate.is_active():
+                # Camera reports no events, skip OpenCV. Once the last detection finished,
+                # drop the stale reference frame and clear the client's motion indicator
+                if motion_window_open and (motion_thread is None or not motion_thread.is_alive()):
+                    previous_frame = None
+                    motion_window_open = False
+                    socketio.emit('motion_status', {'motion': False})
+            else:
+                motion_window_open = True
+                if motion_thread is None or not motion_thread.is_alive():
+                    motion_thread = Thread(target=motion_detection_task, args=(frame,))
+                    motion_thread.start()
 
             # Czekanie przed wysłaniem kolejnej klatki (lower FPS)
             socketio.sleep(1.0 / STREAM_FPS)
@@ -307,6 +329,31 @@ def capture_frames():
             time.sleep(0.01)  # Avoid CPU overload
             continue
     
+def handle_camera_events(events):
+    """Logs camera detection events (from the Tapo API) that woke up motion detection."""
+    for event in events:
+        print(f"Camera event: alarm_type={event.get('alarm_type')} at {time.strftime('%H:%M:%S', time.localtime(event['start_time']))}")
+
+
+def start_event_gate():
+    """Starts polling the camera's own detection events to gate server-side motion detection."""
+    global event_gate
+    if not config.get('camera_events') or camera is None:
+        return
+    min_interval, max_interval = validate_poll_intervals(
+        config.get('event_poll_min', EVENT_POLL_MIN),
+        config.get('event_poll_max', EVENT_POLL_MAX),
+    )
+    event_gate = CameraEventGate(
+        TapoEventSource(camera, camera_lock),
+        min_interval=min_interval,
+        max_interval=max_interval,
+        on_event=handle_camera_events,
+    )
+    event_gate.start()
+    print("Camera event gating enabled")
+
+
 def motion_detection_task(frame):
     motion_detected = detect_motion(frame)
     if motion_detected:
@@ -332,17 +379,13 @@ def move_camera():
         direction = data.get('direction')
         step = int(data.get('step', 10))  # Default step is 10
 
+        moves = {'left': (-step, 0), 'right': (step, 0), 'up': (0, step), 'down': (0, -step)}
+        if direction not in moves:
+            return jsonify({"error": "Invalid direction"}), 400
+
         try:
-            if direction == 'left':
-                camera.moveMotor(-step, 0)
-            elif direction == 'right':
-                camera.moveMotor(step, 0)
-            elif direction == 'up':
-                camera.moveMotor(0, step)
-            elif direction == 'down':
-                camera.moveMotor(0, -step)
-            else:
-                return jsonify({"error": "Invalid direction"}), 400
+            with camera_lock:
+                camera.moveMotor(*moves[direction])
         except Exception as e:
             # If the error message indicates range, return a specific error
             if 'range' in str(e).lower() or 'limit' in str(e).lower() or 'boundary' in str(e).lower():
@@ -382,6 +425,7 @@ def start_video_stream():
     if not camera_connected:
         print("Video stream not started: couldn't connect to camera.")
         return
+    start_event_gate()
     thread = Thread(target=capture_frames)
     thread.daemon = True
     thread.start()
@@ -0,0 +1,156 @@
+from flask import Blueprint, request, Response, abort
+from collections import deque, OrderedDict
+from threading import Lock
+import cv2
+import io
+import time
+import uuid
+import zipfile
+
+snapshot_bp = Blueprint('snapshot', __name__)
+
+BURST_BUFFER_SIZE = 8  # Number of most recent full-resolution frames kept for /snapshot/burst
+DEFAULT_QUALITY = 90  # JPEG quality used when the client does not ask for one
+ENCODE_CACHE_SIZE = 32  # Max number of memoized JPEG encodings
+SNAPSHOT_MAX_AGE = 5.0  # /snapshot.jpg answers 503 when the newest frame is older than this (s)
+
+frame_lock = Lock()  # Guards the frame id and ring buffer
+frame_buffer = deque(maxlen=BURST_BUFFER_SIZE)  # (frame_id, timestamp, frame) tuples, newest last
+frame_counter = 0  # Monotonic id of the last published frame
+BOOT_TOKEN = uuid.uuid4().hex[:8]  # Per-process ETag prefix, frame ids restart at 0 on every start
+
+cache_lock = Lock()  # Guards encode_cache and encode_locks
+encode_cache = OrderedDict()  # (frame_id, width, quality) -> JPEG bytes
+encode_locks = {}  # (frame_id, width, quality) -> Lock held while that key is being encoded
+
+
+def publish_frame(frame):
+    """Stores a decoded full-resolution frame from capture_frames as the latest snapshot.
+    The frame is kept by reference, so callers must not modify it afterwards.
+    """
+    global frame_counter
+    with frame_lock:
+        frame_counter += 1
+        frame_buffer.append((frame_counter, time.time(), frame))
+
+
+def get_frames(count=1):
+    """Returns up to `count` most recent (frame_id, timestamp, frame) tuples, oldest first."""
+    with frame_lock:
+        frames = list(frame_buffer)
+    return frames[-count:] if count > 0 else []
+
+
+def encode_frame(frame_id, frame, width=None, quality=DEFAULT_QUALITY):
+    """Encodes a frame to JPEG, memoized per frame id, width and quality.
+    Concurrent callers for the same key wait for a single encode, other keys encode in parallel.
+    """
+    key = (frame_id, width, quality)
+    with cache_lock:
+        cached = encode_cache.get(key)
+        if cached is not None:
+            encode_cache.move_to_end(key)
+            return cached
+        key_lock = encode_locks.setdefault(key, Lock())
+
+    with key_lock:
+        with cache_lock:
+            cached = encode_cache.get(key)
+        if cached is not None:
+            return cached  # Encoded by another caller while we waited
+
+        try:
+            if width and width < frame.shape[1]:
+                height = round(frame.shape[0] * width / frame.shape[1])
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            ok, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+            if not ok:
+                raise RuntimeError("Failed to encode snapshot.")
+            data = buffer.tobytes()
+
+            with cache_lock:
+                encode_cache[key] = data
+                while len(encode_cache) > ENCODE_CACHE_SIZE:
+                    encode_cache.popitem(last=False)
+            return data
+        finally:
+            # Only the encoding caller cleans up, and only its own lock
+            with cache_lock:
+                if encode_locks.get(key) is key_lock:
+                    del encode_locks[key]
+
+
+def parse_image_args():
+    """Reads optional width and quality query parameters, aborting with 400 on bad values."""
+    width = request.args.get('width', type=int)
+    quality = request.args.get('quality', DEFAULT_QUALITY, type=int)
+    if width is not None and width <= 0:
+        abort(400, description="'width' must be a positive integer")
+    if not 1 <= quality <= 100:
+        abort(400, description="'quality' must be between 1 and 100")
+    return width, quality
+
+
+@snapshot_bp.route('/snapshot.jpg')
+def snapshot():
+    width, quality = parse_image_args()
+    frames = get_frames(1)
+    if not frames:
+        abort(503, description="No frame captured yet")
+    frame_id, timestamp, frame = frames[0]
+    if time.time() - timestamp > SNAPSHOT_MAX_AGE:
+        abort(503, description="Video stream stalled, no recent frame")
+
+    tag = f"{BOOT_TOKEN}-{frame_id}-{width or 'full'}-{quality}"
+    response = Response(mimetype='image/jpeg')
+    response.set_etag(tag)
+    response.cache_control.no_cache = True
+    response.last_modified = timestamp
+    response.headers['X-Timestamp'] = f"{timestamp:.3f}"
+    # Answer If-None-Match before encoding, so unchanged pollers cost nothing
+    if request.if_none_match.contains_weak(tag):
+        response.status_code = 304
+        return response
+
+    response.set_data(encode_frame(frame_id, frame, width, quality))
+    return response
+
+
+@snapshot_bp.route('/snapshot/burst')
+def snapshot_burst():
+    width, quality = parse_image_args()
+    count = request.args.get('count', BURST_BUFFER_SIZE, type=int)
+    fmt = request.args.get('format', 'multipart')
+    if not 1 <= count <= BURST_BUFFER_SIZE:
+        abort(400, description=f"'count' must be between 1 and {BURST_BUFFER_SIZE}")
+    if fmt not in ('multipart', 'zip'):
+        abort(400, description="'format' must be 'multipart' or 'zip'")
+
+    frames = get_frames(count)
+    if not frames:
+        abort(503, description="No frame captured yet")
+    images = [(frame_id, timestamp, encode_frame(frame_id, frame, width, quality))
+              for frame_id, timestamp, frame in frames]
+
+    if fmt == 'zip':
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:  # JPEG is already compressed
+            for frame_id, timestamp, data in images:
+                stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(timestamp))
+                zf.writestr(f"frame_{stamp}_{frame_id}.jpg", data)
+        response = Response(archive.getvalue(), mimetype='application/zip')
+        response.headers['Content-Disposition'] = 'attachment; filename=burst.zip'
+        return response
+
+    boundary = f"burst{images[-1][0]}"
+    body = io.BytesIO()
+    for frame_id, timestamp, data in images:
+        body.write(f"--{boundary}\r\n".encode())
+        body.write(b"Content-Type: image/jpeg\r\n")
+        body.write(f"Content-Length: {len(data)}\r\n".encode())
+        body.write(f"X-Frame-Id: {frame_id}\r\n".encode())
+        body.write(f"X-Timestamp: {timestamp:.3f}\r\n\r\n".encode())
+        body.write(data)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return Response(body.getvalue(), content_type=f'multipart/mixed; boundary={boundary}')
@@ -0,0 +1,13 @@
+import importlib.util
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / 'app'
+
+
+def load_app_module(name):
+    """Loads a single module from app/ without importing the app package,
+    whose __init__ connects to the camera and starts the video stream."""
+    spec = importlib.util.spec_from_file_location(name, APP_DIR / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
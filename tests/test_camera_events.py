@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+
+from . import load_app_module
+
+camera_events = load_app_module('camera_events')
+
+
+class FakeCamera:
+    """Mimics pytapo's Tapo.getEvents(): `start_time`/`end_time` already shifted by the
+    camera's time correction, plus the relative fields pytapo adds."""
+
+    def __init__(self, correction=3600):
+        self.correction = correction
+        self.raw = []  # Entries as in the camera's search_detection_list, in camera time
+
+    def add(self, start_time, end_time=None, alarm_type=2):
+        """Adds an event, times given in local epoch seconds."""
+        end_time = start_time if end_time is None else end_time
+        self.raw.append({'start_time': start_time - self.correction, 'end_time': end_time - self.correction,
+                         'alarm_type': alarm_type})
+
+    def getEvents(self):
+        now = int(time.time())
+        events = []
+        for raw in self.raw:
+            event = dict(raw)
+            event['start_time'] += self.correction
+            event['end_time'] += self.correction
+            event['startRelative'] = now - event['start_time']
+            event['endRelative'] = now - event['end_time']
+            events.append(event)
+        return events
+
+
+class CameraEventGateTest(unittest.TestCase):
+    def setUp(self):
+        self.source = camera_events.StubEventSource()
+        self.gate = camera_events.CameraEventGate(self.source, min_interval=1, max_interval=10, active_window=15)
+
+    def test_idle_backoff(self):
+        intervals = []
+        for _ in range(6):
+            self.gate.poll_once()
+            intervals.append(self.gate.interval)
+        self.assertEqual(intervals, [2, 4, 8, 10, 10, 10])
+        self.assertFalse(self.gate.is_active())
+
+    def test_event_resets_interval(self):
+        for _ in range(4):
+            self.gate.poll_once()
+        self.source.push(alarm_type=6)
+        self.assertEqual(len(self.gate.poll_once()), 1)
+        self.assertEqual(self.gate.interval, 1)
+        self.assertTrue(self.gate.is_active())
+
+    def test_active_window_expires(self):
+        gate = camera_events.CameraEventGate(self.source, min_interval=1, max_interval=1, active_window=0.05)
+        self.source.push()
+        gate.poll_once()
+        self.assertTrue(gate.is_active())
+        time.sleep(0.1)
+        self.assertFalse(gate.is_active())
+
+    def test_window_starts_at_event_time(self):
+        self.source.push(start_time=time.time() - 10)
+        self.gate.poll_once()
+        self.assertLessEqual(self.gate.active_until, time.time() + 5)
+
+    def test_window_counts_from_event_end(self):
+        now = time.time()
+        self.source.push(start_time=now - 30, end_time=now - 2)
+        self.gate.poll_once()
+        self.assertTrue(self.gate.is_active())
+        self.assertLessEqual(self.gate.active_until, now + 13)
+
+    def test_stale_event_does_not_wake(self):
+        for _ in range(4):
+            self.gate.poll_once()
+        self.source.push(start_time=time.time() - 20)
+        self.gate.poll_once()
+        self.assertFalse(self.gate.is_active())
+        self.assertEqual(self.gate.interval, 1)
+
+    def test_future_event_is_capped_to_now(self):
+        self.source.push(start_time=time.time() + 100)
+        self.gate.poll_once()
+        self.assertLessEqual(self.gate.active_until, time.time() + 15)
+
+    def test_poll_failure_is_idle(self):
+        class Broken:
+            def poll(self):
+                raise RuntimeError("camera offline")
+
+        gate = camera_events.CameraEventGate(Broken(), min_interval=1, max_interval=10)
+        self.assertEqual(gate.poll_once(), [])
+        self.assertEqual(gate.interval, 2)
+
+
+class TapoEventSourceTest(unittest.TestCase):
+    def test_first_poll_is_baseline(self):
+        camera = FakeCamera()
+        camera.add(int(time.time()) - 60)
+        source = camera_events.TapoEventSource(camera)
+        self.assertEqual(source.poll(), [])
+        self.assertEqual(source.poll(), [])
+
+    def test_new_events(self):
+        camera = FakeCamera()
+        source = camera_events.TapoEventSource(camera)
+        source.poll()
+        now = int(time.time())
+        camera.add(now - 100)
+        self.assertEqual(len(source.poll()), 1)
+        camera.add(now - 5, alarm_type=2)  # Second motion event inside the 10 minute list
+        camera.add(now - 5, alarm_type=6)  # Person alert in the same second
+        new_events = source.poll()
+        self.assertEqual([e['alarm_type'] for e in new_events], [2, 6])
+        self.assertEqual(new_events[0]['start_time'], now - 5)
+        self.assertEqual(source.poll(), [])
+
+    def test_uses_shared_lock(self):
+        lock = threading.Lock()
+        camera = FakeCamera()
+        camera.getEvents = lambda: self.assertTrue(lock.locked()) or []
+        camera_events.TapoEventSource(camera, lock).poll()
+
+    def test_real_shaped_event_opens_gate(self):
+        camera = FakeCamera()
+        gate = camera_events.CameraEventGate(camera_events.TapoEventSource(camera))
+        gate.poll_once()
+        self.assertFalse(gate.is_active())
+        camera.add(int(time.time()) - 3)
+        self.assertEqual(len(gate.poll_once()), 1)
+        self.assertTrue(gate.is_active())
+
+
+class ValidatePollIntervalsTest(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(camera_events.validate_poll_intervals('2', 5), (2.0, 5.0))
+
+    def test_fallbacks(self):
+        defaults = (camera_events.EVENT_POLL_MIN, camera_events.EVENT_POLL_MAX)
+        for min_interval, max_interval in [(0, 10), (5, 2), (1, 60), ('fast', 10), (None, 10)]:
+            self.assertEqual(camera_events.validate_poll_intervals(min_interval, max_interval), defaults)
+
+
+if __name__ == '__main__':
+    unittest.main()
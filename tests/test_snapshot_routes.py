@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+from flask import Flask
+
+from . import load_app_module
+
+
+class SnapshotRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = load_app_module('snapshot_routes')
+        app = Flask(__name__)
+        app.register_blueprint(self.snapshot.snapshot_bp)
+        self.client = app.test_client()
+
+    def publish(self, value=0):
+        self.snapshot.publish_frame(np.full((90, 160, 3), value, dtype=np.uint8))
+
+    def test_no_frame_yet(self):
+        self.assertEqual(self.client.get('/snapshot.jpg').status_code, 503)
+
+    def test_etag_round_trip(self):
+        self.publish()
+        first = self.client.get('/snapshot.jpg')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.mimetype, 'image/jpeg')
+        self.assertTrue(first.data.startswith(b'\xff\xd8'))
+        etag = first.headers['ETag']
+        self.assertIn(self.snapshot.BOOT_TOKEN, etag)
+        self.assertIsNotNone(first.last_modified)
+        self.assertIn('X-Timestamp', first.headers)
+
+        cached = self.client.get('/snapshot.jpg', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+        weak = self.client.get('/snapshot.jpg', headers={'If-None-Match': f'W/{etag}'})
+        self.assertEqual(weak.status_code, 304)
+
+        self.publish(255)
+        fresh = self.client.get('/snapshot.jpg', headers={'If-None-Match': etag})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh.headers['ETag'], etag)
+
+    def test_stale_frame(self):
+        self.publish()
+        frame_id, timestamp, frame = self.snapshot.frame_buffer[-1]
+        self.snapshot.frame_buffer[-1] = (frame_id, timestamp - self.snapshot.SNAPSHOT_MAX_AGE - 1, frame)
+        self.assertEqual(self.client.get('/snapshot.jpg').status_code, 503)
+
+    def test_width_and_quality(self):
+        self.publish()
+        response = self.client.get('/snapshot.jpg?width=80&quality=50')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('-80-50', response.headers['ETag'])
+        self.assertEqual(self.client.get('/snapshot.jpg?quality=0').status_code, 400)
+        self.assertEqual(self.client.get('/snapshot.jpg?width=-1').status_code, 400)
+
+    def test_encode_is_memoized(self):
+        self.publish()
+        frame_id, _, frame = self.snapshot.get_frames(1)[0]
+        first = self.snapshot.encode_frame(frame_id, frame, 80, 70)
+        self.assertIs(self.snapshot.encode_frame(frame_id, frame, 80, 70), first)
+        self.assertEqual(self.snapshot.encode_locks, {})
+
+    def test_waiter_keeps_newer_lock(self):
+        self.publish()
+        frame_id, _, frame = self.snapshot.get_frames(1)[0]
+        key = (frame_id, None, 60)
+        held = self.snapshot.Lock()
+        held.acquire()  # Pretend another caller is encoding this key
+        self.snapshot.encode_locks[key] = held
+        waiter = threading.Thread(target=self.snapshot.encode_frame, args=(frame_id, frame, None, 60))
+        waiter.start()
+        time.sleep(0.05)  # Let the waiter block on `held`
+
+        # The encoder finished and a newer caller registered its own lock for the key
+        self.snapshot.encode_cache[key] = b'jpeg'
+        newer = self.snapshot.Lock()
+        self.snapshot.encode_locks[key] = newer
+        held.release()
+        waiter.join()
+        self.assertIs(self.snapshot.encode_locks[key], newer)
+
+    def test_burst(self):
+        for value in range(3):
+            self.publish(value)
+        multipart = self.client.get('/snapshot/burst?count=2')
+        self.assertEqual(multipart.status_code, 200)
+        self.assertEqual(multipart.mimetype, 'multipart/mixed')
+        self.assertEqual(multipart.data.count(b'Content-Type: image/jpeg'), 2)
+
+        archive = self.client.get('/snapshot/burst?count=3&format=zip')
+        self.assertEqual(archive.mimetype, 'application/zip')
+        self.assertEqual(self.client.get('/snapshot/burst?count=99').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()